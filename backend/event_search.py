@@ -0,0 +1,131 @@
+import re
+import json
+import time
+import base64
+import unicodedata
+from bisect import bisect_left
+from datetime import datetime
+
+# How long the in-memory prefix index is reused before being rebuilt from the database
+PREFIX_INDEX_TTL_SECONDS = 300
+
+def normalize_description(description):
+    """Reduce an event description to a key shared by near-duplicate names.
+
+    Case, accents, punctuation, '&' vs 'and' and extra whitespace are ignored, so
+    e.g. "New York Fashion Week: Men's" and "new york fashion week - mens" collapse
+    to the same key.
+    """
+    text = unicodedata.normalize('NFKD', description)
+    text = ''.join(ch for ch in text if not unicodedata.combining(ch)).casefold()
+    text = text.replace('&', ' and ')
+    text = re.sub(r"['’]", '', text)
+    text = re.sub(r'[^\w]+', ' ', text)
+    return ' '.join(text.split())
+
+def build_prefix_index(rows):
+    """Build a sorted prefix index from (id, description) rows.
+
+    Every word boundary of the normalized description gets a key, so a query
+    matches the start of any word in the name, not only the first one.
+    """
+    keys = []
+    for event_id, description in rows:
+        words = normalize_description(description).split()
+        for i in range(len(words)):
+            keys.append((' '.join(words[i:]), description, event_id))
+    keys.sort()
+    return keys
+
+def search_prefix_index(keys, query, limit):
+    """Return up to limit (id, description) matches for query, ordered by description."""
+    prefix = normalize_description(query)
+    if not prefix:
+        return []
+    matches = {}
+    # Walk forward from the bisect position rather than slicing, which would copy the rest of the index
+    for i in range(bisect_left(keys, (prefix,)), len(keys)):
+        key, description, event_id = keys[i]
+        if not key.startswith(prefix):
+            break
+        matches[event_id] = description
+    return sorted(matches.items(), key=lambda item: (item[1], item[0]))[:limit]
+
+def word_prefix_patterns(normalized):
+    """Return the LIKE patterns matching normalized text at the start of any word.
+
+    This is the SQL form of search_prefix_index, for use against normalized_description.
+    """
+    # Normalized text is only word characters and spaces, so '_' is the one LIKE wildcard to escape
+    escaped = normalized.replace('_', '\\_')
+    return escaped + '%', '% ' + escaped + '%'
+
+class PrefixIndexCache:
+    """Keep a prefix index built by load_rows() and rebuild it once it is older than the TTL."""
+
+    def __init__(self, load_rows, ttl=PREFIX_INDEX_TTL_SECONDS):
+        self.load_rows = load_rows
+        self.ttl = ttl
+        self.keys = None
+        self.built_at = 0
+
+    def search(self, query, limit):
+        if self.keys is None or time.monotonic() - self.built_at > self.ttl:
+            self.keys = build_prefix_index(self.load_rows())
+            self.built_at = time.monotonic()
+        return search_prefix_index(self.keys, query, limit)
+
+# Keyset pagination: ?limit=N returns one page plus an opaque cursor, passed back as ?after=<cursor>.
+# A cursor is the [sort value, id] of the last row on the page.
+MAX_PAGE_SIZE = 500
+MAX_ID = 2 ** 31 - 1  # SERIAL columns are 32-bit
+
+def encode_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+def parse_cursor_text(value):
+    # Postgres text cannot hold NUL characters
+    if '\x00' in value:
+        raise ValueError("Invalid cursor")
+    return value
+
+def parse_cursor_date(value):
+    return datetime.fromisoformat(value).date()
+
+def decode_cursor(cursor, parse_sort_value):
+    """Decode a [sort value, id] cursor, converting the sort value with parse_sort_value."""
+    try:
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+    except ValueError:
+        raise ValueError("Invalid cursor")
+    if (not isinstance(values, list) or len(values) != 2 or not isinstance(values[0], str)
+            or type(values[1]) is not int or not 0 < values[1] <= MAX_ID):
+        raise ValueError("Invalid cursor")
+    try:
+        return [parse_sort_value(values[0]), values[1]]
+    except ValueError:
+        raise ValueError("Invalid cursor")
+
+def parse_page_params(limit, after, parse_sort_value):
+    """Return (limit, after) from raw query values; (None, None) means an unpaginated response.
+
+    Raises ValueError with a message suitable for a 400 response.
+    """
+    if limit is None and after is None:
+        return None, None
+    try:
+        limit = int(limit) if limit is not None else MAX_PAGE_SIZE
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        raise ValueError(f"limit must be between 1 and {MAX_PAGE_SIZE}")
+    return limit, decode_cursor(after, parse_sort_value) if after else None
+
+def next_page_cursor(records, limit, sort_column):
+    """Return the cursor for the page after records, or None if this was the last page."""
+    if len(records) < limit:
+        return None
+    sort_value = records[-1][sort_column]
+    if hasattr(sort_value, 'isoformat'):
+        sort_value = sort_value.isoformat()
+    return encode_cursor([str(sort_value), int(records[-1]['id'])])
@@ -0,0 +1,278 @@
+import os
+import io
+import sys
+import csv
+import json
+import argparse
+import itertools
+from datetime import date, datetime
+from decimal import Decimal
+import psycopg2
+from dotenv import load_dotenv
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Database connection details
+DB_NAME = os.getenv('POSTGRES_DB')
+DB_USER = os.getenv('POSTGRES_USER')
+DB_PASSWORD = os.getenv('POSTGRES_PASSWORD')
+DB_HOST = os.getenv('POSTGRES_HOST')
+DB_PORT = os.getenv('POSTGRES_PORT', 5432)  # Default to 5432 if not set
+
+# Connection string
+conn_string = f'postgresql://{DB_USER}:{DB_PASSWORD}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
+
+# Rows fetched from the server-side cursor (and written) per chunk
+DEFAULT_CHUNK_SIZE = 10000
+# Upper bound on a requested chunk size, so one chunk can never hold a whole table
+MAX_CHUNK_SIZE = DEFAULT_CHUNK_SIZE * 10
+
+# Base query, date column and output column types for each exportable dataset
+EXPORT_QUERIES = {
+    'stock-data': {
+        'query': """
+        SELECT stock_companies.stock_symbol, stock_data.date, stock_data.close_price
+        FROM stock_data
+        JOIN stock_companies ON stock_data.company_id = stock_companies.id
+        """,
+        'date_column': 'stock_data.date',
+        'column_types': {'stock_symbol': 'string', 'date': 'date', 'close_price': 'numeric'},
+    },
+    'event-impact': {
+        'query': """
+        SELECT stock_companies.stock_symbol, event_impact.event_date, event_impact.event,
+               event_impact.pre_event_price, event_impact.post_event_price, event_impact.impact
+        FROM event_impact
+        JOIN stock_companies ON event_impact.company_id = stock_companies.id
+        """,
+        'date_column': 'event_impact.event_date',
+        'column_types': {'stock_symbol': 'string', 'event_date': 'date', 'event': 'string',
+                         'pre_event_price': 'numeric', 'post_event_price': 'numeric', 'impact': 'numeric'},
+    },
+    'forecast': {
+        'query': """
+        SELECT stock_companies.stock_symbol, stock_forecast.forecast_date, stock_forecast.forecast_price
+        FROM stock_forecast
+        JOIN stock_companies ON stock_forecast.company_id = stock_companies.id
+        """,
+        'date_column': 'stock_forecast.forecast_date',
+        'column_types': {'stock_symbol': 'string', 'forecast_date': 'date', 'forecast_price': 'numeric'},
+    },
+}
+
+EXPORT_FORMATS = {
+    'csv': 'text/csv',
+    'ndjson': 'application/x-ndjson',
+    'parquet': 'application/vnd.apache.parquet',
+}
+
+def parse_export_date(value):
+    """Parse an optional YYYY-MM-DD filter value."""
+    if not value:
+        return None
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date()
+    except ValueError:
+        raise ValueError(f"Invalid date '{value}', expected YYYY-MM-DD")
+
+def parse_tickers(values):
+    """Flatten repeated and comma-separated ticker values, e.g. ['LVMUY,NKE', 'RL']."""
+    return [ticker.strip() for value in values for ticker in value.split(',') if ticker.strip()]
+
+def build_export_query(dataset, tickers=None, start_date=None, end_date=None):
+    """Return the parameterized SQL and params for a dataset export."""
+    if dataset not in EXPORT_QUERIES:
+        raise ValueError(f"Unknown dataset '{dataset}', expected one of {', '.join(EXPORT_QUERIES)}")
+    spec = EXPORT_QUERIES[dataset]
+    date_column = spec['date_column']
+
+    conditions = []
+    params = []
+    if tickers:
+        conditions.append("stock_companies.stock_symbol = ANY(%s)")
+        params.append(list(tickers))
+    if start_date:
+        conditions.append(f"{date_column} >= %s")
+        params.append(start_date)
+    if end_date:
+        conditions.append(f"{date_column} <= %s")
+        params.append(end_date)
+
+    query = spec['query']
+    if conditions:
+        query += "WHERE " + " AND ".join(conditions) + "\n"
+    query += f"ORDER BY stock_companies.stock_symbol, {date_column};"
+    return query, params
+
+def iter_export_chunks(db_conn_string, dataset, tickers=None, start_date=None, end_date=None,
+                       chunk_size=DEFAULT_CHUNK_SIZE):
+    """Yield the column names, then lists of at most chunk_size rows.
+
+    Rows are read through a server-side (named) cursor, so only one chunk is
+    held in memory no matter how many rows the export covers.
+    """
+    query, params = build_export_query(dataset, tickers, start_date, end_date)
+    export_conn = psycopg2.connect(db_conn_string)
+    try:
+        export_conn.set_session(readonly=True)
+        with export_conn.cursor(name=f"export_{dataset.replace('-', '_')}") as cursor:
+            cursor.itersize = chunk_size
+            cursor.execute(query, params)
+            rows = cursor.fetchmany(chunk_size)
+            # Named cursors only expose a description after the first fetch
+            yield [column[0] for column in cursor.description]
+            while rows:
+                yield rows
+                rows = cursor.fetchmany(chunk_size)
+    finally:
+        export_conn.close()
+
+def _json_default(value):
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+def stream_csv(chunks):
+    columns = next(chunks)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    for rows in chunks:
+        writer.writerows(rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate(0)
+    # Header only, for an export that matched no rows
+    if buffer.tell():
+        yield buffer.getvalue()
+
+def stream_ndjson(chunks):
+    columns = next(chunks)
+    for rows in chunks:
+        yield ''.join(json.dumps(dict(zip(columns, row)), default=_json_default) + '\n' for row in rows)
+
+class _ParquetSink(io.RawIOBase):
+    """Write-only file that hands written bytes back out and keeps an absolute position.
+
+    ParquetWriter records row group offsets from tell(), so the position must keep
+    counting even after the buffered bytes have been drained.
+    """
+
+    def __init__(self):
+        self.parts = []
+        self.position = 0
+
+    def writable(self):
+        return True
+
+    def write(self, data):
+        self.parts.append(bytes(data))
+        self.position += len(data)
+        return len(data)
+
+    def tell(self):
+        return self.position
+
+    def drain(self):
+        data = b''.join(self.parts)
+        self.parts = []
+        return data
+
+def stream_parquet(chunks, column_types):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires the pyarrow package")
+
+    # A fixed schema per dataset, so every row group matches whatever values (or NULLs) a chunk holds
+    arrow_types = {'string': pa.string(), 'date': pa.date32(), 'numeric': pa.float64()}
+    columns = next(chunks)
+    schema = pa.schema([(name, arrow_types[column_types[name]]) for name in columns])
+    numeric = [column_types[name] == 'numeric' for name in columns]
+    sink = _ParquetSink()
+    writer = pq.ParquetWriter(sink, schema)
+    try:
+        for rows in chunks:
+            data = {}
+            for i, name in enumerate(columns):
+                values = [row[i] for row in rows]
+                if numeric[i]:
+                    # NUMERIC columns arrive as Decimal, which pyarrow will not convert to float64 itself
+                    values = [None if value is None else float(value) for value in values]
+                data[name] = values
+            # One row group per chunk
+            writer.write_table(pa.Table.from_pydict(data, schema=schema))
+            yield sink.drain()
+    finally:
+        writer.close()
+    yield sink.drain()
+
+def _close_after(stream, chunks):
+    # Release the export connection as soon as the consumer stops reading
+    try:
+        yield from stream
+    finally:
+        chunks.close()
+
+EXPORT_STREAMERS = {
+    'csv': stream_csv,
+    'ndjson': stream_ndjson,
+    'parquet': stream_parquet,
+}
+
+def stream_export(db_conn_string, dataset, fmt, tickers=None, start_date=None, end_date=None,
+                  chunk_size=DEFAULT_CHUNK_SIZE):
+    """Return a generator of the encoded export, one chunk at a time.
+
+    The connection is opened and the query run before this returns, so database
+    errors are raised here rather than partway through the stream.
+    """
+    if fmt not in EXPORT_STREAMERS:
+        raise ValueError(f"Unknown format '{fmt}', expected one of {', '.join(EXPORT_STREAMERS)}")
+    chunks = iter_export_chunks(db_conn_string, dataset, tickers, start_date, end_date, chunk_size)
+    columns = next(chunks)
+    header_and_rows = itertools.chain([columns], chunks)
+    if fmt == 'parquet':
+        stream = stream_parquet(header_and_rows, EXPORT_QUERIES[dataset]['column_types'])
+    else:
+        stream = EXPORT_STREAMERS[fmt](header_and_rows)
+    return _close_after(stream, chunks)
+
+def main():
+    parser = argparse.ArgumentParser(description="Export price, event impact or forecast history.")
+    parser.add_argument('dataset', choices=list(EXPORT_QUERIES))
+    parser.add_argument('--format', dest='fmt', choices=list(EXPORT_FORMATS), default='csv')
+    parser.add_argument('--ticker', action='append', default=[], help="Ticker(s) to include, comma-separated (repeatable)")
+    parser.add_argument('--start-date', help="First date to include (YYYY-MM-DD)")
+    parser.add_argument('--end-date', help="Last date to include (YYYY-MM-DD)")
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument('--output', '-o', help="Output file (defaults to stdout)")
+    args = parser.parse_args()
+
+    try:
+        start_date = parse_export_date(args.start_date)
+        end_date = parse_export_date(args.end_date)
+    except ValueError as e:
+        parser.error(str(e))
+    if not 0 < args.chunk_size <= MAX_CHUNK_SIZE:
+        parser.error(f"--chunk-size must be between 1 and {MAX_CHUNK_SIZE}")
+
+    stream = stream_export(conn_string, args.dataset, args.fmt, parse_tickers(args.ticker), start_date, end_date, args.chunk_size)
+    binary = args.fmt == 'parquet'
+    if args.output:
+        out = open(args.output, 'wb' if binary else 'w', newline=None if binary else '')
+    else:
+        out = sys.stdout.buffer if binary else sys.stdout
+    try:
+        for piece in stream:
+            out.write(piece)
+    finally:
+        if args.output:
+            out.close()
+
+if __name__ == '__main__':
+    main()
@@ -11,6 +11,7 @@ from selenium.webdriver.chrome.service import Service
 from datetime import datetime
 from webdriver_manager.chrome import ChromeDriverManager
 from dotenv import load_dotenv
+from event_search import normalize_description
 
 # Load environment variables from .env file
 load_dotenv()
@@ -88,22 +89,99 @@ def parse_date(date_str):
     else:
         return datetime.strptime(date_str, '%b %d, %Y')
 
+# Function to collapse event names sharing a normalized description onto the lowest id
+def merge_duplicate_event_names():
+    keep_ids = "SELECT id, MIN(id) OVER (PARTITION BY normalized_description) AS keep_id FROM event_names"
+    cursor.execute(f"""
+        UPDATE event_dates ed SET event_id = n.keep_id
+        FROM ({keep_ids}) n
+        WHERE ed.event_id = n.id AND n.id <> n.keep_id
+    """)
+    cursor.execute(f"""
+        UPDATE repeating_events re SET event_name_id = n.keep_id
+        FROM ({keep_ids}) n
+        WHERE re.event_name_id = n.id AND n.id <> n.keep_id
+    """)
+    cursor.execute(f"""
+        DELETE FROM event_names en
+        USING ({keep_ids}) n
+        WHERE en.id = n.id AND n.id <> n.keep_id
+    """)
+
+# Function to collapse repeated event dates (and their repeating_events rows) onto the lowest id
+def merge_duplicate_event_dates():
+    cursor.execute("""
+        UPDATE repeating_events re SET event_date_id = d.keep_id
+        FROM (SELECT id, MIN(id) OVER (PARTITION BY event_id, event_date) AS keep_id FROM event_dates) d
+        WHERE re.event_date_id = d.id AND d.id <> d.keep_id
+    """)
+    cursor.execute("""
+        DELETE FROM event_dates ed
+        USING (SELECT id, MIN(id) OVER (PARTITION BY event_id, event_date) AS keep_id FROM event_dates) d
+        WHERE ed.id = d.id AND d.id <> d.keep_id
+    """)
+    cursor.execute("""
+        DELETE FROM repeating_events re
+        USING (SELECT id, MIN(id) OVER (PARTITION BY event_date_id, stock_id) AS keep_id FROM repeating_events) r
+        WHERE re.id = r.id AND r.id <> r.keep_id
+    """)
+
+# Function to migrate an existing database to the normalized event names and indexes defined in init.sql
+def ensure_event_name_indexes():
+    cursor.execute("ALTER TABLE event_names ADD COLUMN IF NOT EXISTS normalized_description TEXT")
+    cursor.execute("SELECT id, description FROM event_names WHERE normalized_description IS NULL")
+    for event_id, description in cursor.fetchall():
+        cursor.execute("UPDATE event_names SET normalized_description = %s WHERE id = %s", (normalize_description(description), event_id))
+    # Merging names can leave one event with the same date twice, so names go first
+    merge_duplicate_event_names()
+    merge_duplicate_event_dates()
+    cursor.execute("ALTER TABLE event_names ALTER COLUMN normalized_description SET NOT NULL")
+
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS event_names_normalized_idx ON event_names (normalized_description)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS event_dates_event_id_date_idx ON event_dates (event_id, event_date)")
+    cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS repeating_events_date_stock_idx ON repeating_events (event_date_id, stock_id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS event_names_description_id_idx ON event_names (description, id)")
+    cursor.execute("CREATE INDEX IF NOT EXISTS event_dates_event_date_id_idx ON event_dates (event_date, id)")
+    conn.commit()
+
+    # The trigram index is optional; without pg_trgm the dashboard falls back to an in-memory prefix index
+    try:
+        cursor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        cursor.execute("CREATE INDEX IF NOT EXISTS event_names_normalized_trgm_idx ON event_names USING gin (normalized_description gin_trgm_ops)")
+        conn.commit()
+    except psycopg2.Error as e:
+        conn.rollback()
+        print(f"Trigram index not created, event search will use the prefix index fallback: {e}")
+
+# Function to get the event_id for a description, reusing the row of any near-duplicate name
+def get_or_insert_event_name(description):
+    normalized = normalize_description(description)
+    # The unique index on normalized_description makes near-duplicates conflict with the existing row
+    cursor.execute(
+        "INSERT INTO event_names (description, normalized_description) VALUES (%s, %s) ON CONFLICT DO NOTHING RETURNING id",
+        (description, normalized)
+    )
+    result = cursor.fetchone()
+    if result is None:
+        cursor.execute("SELECT id FROM event_names WHERE normalized_description = %s", (normalized,))
+        result = cursor.fetchone()
+    return result[0]
+
 # Function to store events in the database
 def store_events(events):
     for date, description in events:
         # Insert or get event_id from event_names table
-        cursor.execute("INSERT INTO event_names (description) VALUES (%s) ON CONFLICT (description) DO NOTHING RETURNING id", (description,))
-        result = cursor.fetchone()
-        if result is None:
-            cursor.execute("SELECT id FROM event_names WHERE description = %s", (description,))
-            event_id = cursor.fetchone()[0]
-        else:
-            event_id = result[0]
+        event_id = get_or_insert_event_name(description)
 
         # Insert the event date with the event_id into event_dates table
         event_date = parse_date(date)
-        cursor.execute("INSERT INTO event_dates (event_id, event_date) VALUES (%s, %s) ON CONFLICT DO NOTHING RETURNING id", (event_id, event_date))
-        event_date_id = cursor.fetchone()[0]
+        cursor.execute("INSERT INTO event_dates (event_id, event_date) VALUES (%s, %s) ON CONFLICT (event_id, event_date) DO NOTHING RETURNING id", (event_id, event_date))
+        result = cursor.fetchone()
+        if result is None:
+            # Already stored, e.g. listed on both the upcoming and past pages or under a near-duplicate name
+            cursor.execute("SELECT id FROM event_dates WHERE event_id = %s AND event_date = %s", (event_id, event_date))
+            result = cursor.fetchone()
+        event_date_id = result[0]
 
         # Fetch stock prices for the event date and insert into repeating_events
         cursor.execute("SELECT id, stock_symbol FROM stock_companies")
@@ -115,7 +193,7 @@ def store_events(events):
             if stock_price_result:
                 stock_price = stock_price_result[0]
                 cursor.execute(
-                    "INSERT INTO repeating_events (event_name_id, event_date_id, event_date, stock_id, stock_price) VALUES (%s, %s, %s, %s, %s)",
+                    "INSERT INTO repeating_events (event_name_id, event_date_id, event_date, stock_id, stock_price) VALUES (%s, %s, %s, %s, %s) ON CONFLICT (event_date_id, stock_id) DO NOTHING",
                     (event_id, event_date_id, event_date, stock_id, stock_price)
                 )
 
@@ -144,6 +222,7 @@ for event in past_events:
 all_events = upcoming_events + past_events
 
 # Store events in the database
+ensure_event_name_indexes()
 store_events(all_events)
 
 print("Events have been stored in the database.")
@@ -4,9 +4,12 @@ import pandas as pd
 import psycopg2
 from psycopg2 import OperationalError
 from sqlalchemy import create_engine
-from flask import Flask, jsonify
+from flask import Flask, jsonify, request, Response, stream_with_context
 from flask_cors import CORS
 from dotenv import load_dotenv
+from event_search import (normalize_description, word_prefix_patterns, PrefixIndexCache, PREFIX_INDEX_TTL_SECONDS,
+                          MAX_PAGE_SIZE, parse_cursor_text, parse_cursor_date, parse_page_params, next_page_cursor)
+from export_data import EXPORT_QUERIES, EXPORT_FORMATS, DEFAULT_CHUNK_SIZE, MAX_CHUNK_SIZE, parse_export_date, parse_tickers, stream_export
 
 # Load environment variables from .env file
 load_dotenv()
@@ -86,18 +89,36 @@ def fetch_event_impact_data(ticker):
     df = pd.read_sql(query, engine)
     return df
 
-def fetch_upcoming_events():
-    query = """
-    SELECT en.description AS event_name, ed.event_date
+def fetch_upcoming_events(limit=None, after=None):
+    conditions = ["ed.event_date > CURRENT_DATE"]
+    params = []
+    if after is not None:
+        conditions.append("(ed.event_date, ed.id) > (%s, %s)")
+        params.extend(after)
+    query = f"""
+    SELECT ed.id, en.description AS event_name, ed.event_date
     FROM event_dates ed
     JOIN event_names en ON ed.event_id = en.id
-    WHERE ed.event_date > CURRENT_DATE
-    ORDER BY ed.event_date;
+    WHERE {' AND '.join(conditions)}
+    ORDER BY ed.event_date, ed.id
     """
-    df = pd.read_sql(query, engine)
+    if limit is not None:
+        query += "LIMIT %s"
+        params.append(limit)
+    df = pd.read_sql(query, engine, params=tuple(params))
     print("Upcoming Events:", df.to_dict(orient='records'))  # Debugging statement
     return df
 
+def parse_page_args(parse_sort_value):
+    """Return (limit, after) from the query string; (None, None) means an unpaginated response."""
+    return parse_page_params(request.args.get('limit'), request.args.get('after'), parse_sort_value)
+
+def page_response(df, limit, sort_column):
+    records = df.to_dict(orient='records')
+    if limit is None:
+        return jsonify(records)
+    return jsonify({'items': records, 'next_cursor': next_page_cursor(records, limit, sort_column)})
+
 def fetch_fashion_brands(stock_symbol):
     query = f"""
     SELECT brand_name
@@ -122,10 +143,71 @@ def get_stock_data_route(ticker):
 
 @app.route('/api/event-names', methods=['GET'])
 def get_event_names():
-    query = "SELECT id, description FROM event_names ORDER BY description;"
-    df = pd.read_sql(query, engine)
+    try:
+        limit, after = parse_page_args(parse_cursor_text)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    conditions = []
+    params = []
+    if after is not None:
+        conditions.append("(description, id) > (%s, %s)")
+        params.extend(after)
+    query = "SELECT id, description FROM event_names"
+    if conditions:
+        query += " WHERE " + " AND ".join(conditions)
+    query += " ORDER BY description, id"
+    if limit is not None:
+        query += " LIMIT %s"
+        params.append(limit)
+    df = pd.read_sql(query, engine, params=tuple(params))
     print("Event Names:", df.to_dict(orient='records'))  # Debugging statement
-    return jsonify(df.to_dict(orient='records'))
+    return page_response(df, limit, 'description')
+
+def fetch_event_names_for_index():
+    return pd.read_sql("SELECT id, description FROM event_names;", engine).itertuples(index=False)
+
+event_name_prefix_index = PrefixIndexCache(fetch_event_names_for_index)
+trigram_available = None
+trigram_checked_at = 0
+
+def has_trigram_index():
+    # Rechecked on the prefix index TTL, so an index created after startup is picked up
+    global trigram_available, trigram_checked_at
+    if trigram_available is None or time.monotonic() - trigram_checked_at > PREFIX_INDEX_TTL_SECONDS:
+        query = "SELECT EXISTS (SELECT 1 FROM pg_indexes WHERE indexname = 'event_names_normalized_trgm_idx') AS available;"
+        trigram_available = bool(pd.read_sql(query, engine)['available'].iloc[0])
+        trigram_checked_at = time.monotonic()
+    return trigram_available
+
+@app.route('/api/event-names/search', methods=['GET'])
+def search_event_names():
+    q = request.args.get('q', '')
+    try:
+        limit = int(request.args.get('limit', 10))
+    except ValueError:
+        return jsonify({'error': 'limit must be an integer'}), 400
+    if not 0 < limit <= MAX_PAGE_SIZE:
+        return jsonify({'error': f"limit must be between 1 and {MAX_PAGE_SIZE}"}), 400
+    normalized = normalize_description(q)
+    if not normalized:
+        return jsonify([])
+
+    # Both backends match the query against the start of any word and order by name (in code point
+    # order, as Python sorts), so the result is the same with or without pg_trgm
+    if has_trigram_index():
+        query = """
+        SELECT id, description
+        FROM event_names
+        WHERE normalized_description LIKE %s OR normalized_description LIKE %s
+        ORDER BY description COLLATE "C", id
+        LIMIT %s;
+        """
+        df = pd.read_sql(query, engine, params=(*word_prefix_patterns(normalized), limit))
+        results = df.to_dict(orient='records')
+    else:
+        results = [{'id': event_id, 'description': description}
+                   for event_id, description in event_name_prefix_index.search(normalized, limit)]
+    return jsonify(results)
 
 @app.route('/api/event-impacts/<event_id>', methods=['GET'])
 def get_event_impacts(event_id):
@@ -200,14 +282,49 @@ def get_event_average_impact_graph(event_id):
 
 @app.route('/api/upcoming-events', methods=['GET'])
 def get_upcoming_events():
-    df = fetch_upcoming_events()
-    return jsonify(df.to_dict(orient='records'))
+    try:
+        limit, after = parse_page_args(parse_cursor_date)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    df = fetch_upcoming_events(limit, after)
+    return page_response(df, limit, 'event_date')
 
 @app.route('/api/fashion-brands/<stock_symbol>', methods=['GET'])
 def get_fashion_brands_route(stock_symbol):
     df = fetch_fashion_brands(stock_symbol)
     return jsonify(df.to_dict(orient='records'))
 
+@app.route('/api/export/<dataset>', methods=['GET'])
+def export_dataset(dataset):
+    if dataset not in EXPORT_QUERIES:
+        return jsonify({'error': f"Unknown dataset '{dataset}'"}), 404
+    fmt = request.args.get('format', 'csv')
+    if fmt not in EXPORT_FORMATS:
+        return jsonify({'error': f"Unknown format '{fmt}', expected one of {', '.join(EXPORT_FORMATS)}"}), 400
+    # Accept both ?ticker=A&ticker=B and ?ticker=A,B
+    tickers = parse_tickers(request.args.getlist('ticker'))
+    try:
+        start_date = parse_export_date(request.args.get('start_date'))
+        end_date = parse_export_date(request.args.get('end_date'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    try:
+        chunk_size = int(request.args.get('chunk_size', DEFAULT_CHUNK_SIZE))
+    except ValueError:
+        return jsonify({'error': 'chunk_size must be an integer'}), 400
+    if not 0 < chunk_size <= MAX_CHUNK_SIZE:
+        return jsonify({'error': f"chunk_size must be between 1 and {MAX_CHUNK_SIZE}"}), 400
+
+    # Connect and run the query before any headers go out, so a database failure is a 5xx and not a truncated download
+    try:
+        stream = stream_export(conn_string, dataset, fmt, tickers, start_date, end_date, chunk_size)
+    except psycopg2.Error as e:
+        print(f"Export of {dataset} failed: {e}")
+        return jsonify({'error': 'Export failed, the database is unavailable or the query could not run'}), 503
+    response = Response(stream_with_context(stream), mimetype=EXPORT_FORMATS[fmt])
+    response.headers['Content-Disposition'] = f'attachment; filename="{dataset}.{fmt}"'
+    return response
+
 def analyze_stock_performance(ticker):
     stock_data = fetch_stock_data(ticker)
     sentiment_data = fetch_sentiment_data_from_db(ticker)
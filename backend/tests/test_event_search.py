@@ -0,0 +1,103 @@
+import json
+import base64
+from datetime import date
+
+import pytest
+
+from event_search import (MAX_PAGE_SIZE, build_prefix_index, decode_cursor, encode_cursor, next_page_cursor,
+                          normalize_description, parse_cursor_date, parse_cursor_text, parse_page_params,
+                          search_prefix_index, word_prefix_patterns)
+
+EVENT_NAMES = [
+    (1, "New York Fashion Week: Men's"),
+    (2, 'London Fashion Week'),
+    (3, 'CFDA Awards'),
+    (4, 'Paris Haute Couture & Menswear'),
+]
+
+def raw_cursor(values):
+    return base64.urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+@pytest.mark.parametrize('variant', [
+    "New York Fashion Week: Men's",
+    'new york fashion week - mens',
+    'NEW YORK FASHION WEEK   MEN’S',
+])
+def test_normalize_description_collapses_case_punctuation_and_apostrophes(variant):
+    assert normalize_description(variant) == 'new york fashion week mens'
+
+def test_normalize_description_collapses_accents_and_ampersand():
+    assert normalize_description('Hermès & Co') == normalize_description('Hermes and Co') == 'hermes and co'
+
+def test_normalize_description_keeps_different_events_apart():
+    assert normalize_description('London Fashion Week') != normalize_description('Paris Fashion Week')
+
+def test_search_prefix_index_matches_the_start_of_any_word():
+    keys = build_prefix_index(EVENT_NAMES)
+    assert search_prefix_index(keys, 'Fash', 10) == [(2, 'London Fashion Week'), (1, "New York Fashion Week: Men's")]
+    assert search_prefix_index(keys, 'york fash', 10) == [(1, "New York Fashion Week: Men's")]
+    assert search_prefix_index(keys, 'couture and', 10) == [(4, 'Paris Haute Couture & Menswear')]
+
+def test_search_prefix_index_does_not_match_inside_words():
+    keys = build_prefix_index(EVENT_NAMES)
+    assert search_prefix_index(keys, 'ashion', 10) == []
+
+def test_search_prefix_index_returns_each_event_once_up_to_limit():
+    keys = build_prefix_index(EVENT_NAMES)
+    # "men" starts two words of event 1 and one of event 4
+    assert search_prefix_index(keys, 'men', 10) == [(1, "New York Fashion Week: Men's"), (4, 'Paris Haute Couture & Menswear')]
+    assert search_prefix_index(keys, 'men', 1) == [(1, "New York Fashion Week: Men's")]
+
+def test_search_prefix_index_ignores_empty_query():
+    assert search_prefix_index(build_prefix_index(EVENT_NAMES), ' - ', 10) == []
+
+def test_word_prefix_patterns_match_first_or_later_word():
+    assert word_prefix_patterns('fashion wee') == ('fashion wee%', '% fashion wee%')
+    assert word_prefix_patterns('new_york') == ('new\\_york%', '% new\\_york%')
+
+def test_cursor_round_trip():
+    records = [{'id': 3, 'event_date': date(2026, 9, 5)}, {'id': 7, 'event_date': date(2026, 9, 12)}]
+    cursor = next_page_cursor(records, 2, 'event_date')
+    assert decode_cursor(cursor, parse_cursor_date) == [date(2026, 9, 12), 7]
+
+    records = [{'id': 4, 'description': 'London Fashion Week'}]
+    cursor = next_page_cursor(records, 1, 'description')
+    assert parse_page_params('1', cursor, parse_cursor_text) == (1, ['London Fashion Week', 4])
+
+def test_next_page_cursor_is_none_on_last_page():
+    assert next_page_cursor([{'id': 1, 'description': 'CFDA Awards'}], 2, 'description') is None
+
+def test_parse_page_params_unpaginated_without_limit_or_after():
+    assert parse_page_params(None, None, parse_cursor_text) == (None, None)
+
+@pytest.mark.parametrize('cursor', [
+    'not-a-cursor!',
+    raw_cursor(['2026-09-12'])[:-4],
+    raw_cursor({'event_date': '2026-09-12', 'id': 7}),
+    raw_cursor(['2026-09-12', 7, 1]),
+])
+def test_decode_cursor_rejects_tampered_cursor(cursor):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(cursor, parse_cursor_date)
+
+@pytest.mark.parametrize('values, parse_sort_value', [
+    (['x', 'y'], parse_cursor_date),
+    (['not a date', 7], parse_cursor_date),
+    ([{}, 1], parse_cursor_text),
+    (['London', True], parse_cursor_text),
+    (['London', 2 ** 40], parse_cursor_text),
+    (['Lon\x00don', 1], parse_cursor_text),
+])
+def test_decode_cursor_rejects_wrong_typed_cursor(values, parse_sort_value):
+    with pytest.raises(ValueError, match='Invalid cursor'):
+        decode_cursor(raw_cursor(values), parse_sort_value)
+
+@pytest.mark.parametrize('limit, message', [
+    ('0', f'limit must be between 1 and {MAX_PAGE_SIZE}'),
+    (str(MAX_PAGE_SIZE + 1), f'limit must be between 1 and {MAX_PAGE_SIZE}'),
+    ('ten', 'limit must be an integer'),
+])
+def test_parse_page_params_rejects_bad_limit(limit, message):
+    with pytest.raises(ValueError) as excinfo:
+        parse_page_params(limit, None, parse_cursor_text)
+    assert str(excinfo.value) == message
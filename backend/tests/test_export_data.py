@@ -0,0 +1,93 @@
+import io
+import csv
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+import export_data
+from export_data import EXPORT_QUERIES, parse_tickers, stream_csv, stream_export, stream_parquet
+
+EVENT_IMPACT_COLUMNS = ['stock_symbol', 'event_date', 'event', 'pre_event_price', 'post_event_price', 'impact']
+
+def fake_chunks(columns, *chunks):
+    yield columns
+    for rows in chunks:
+        yield rows
+
+def test_parse_tickers_accepts_repeated_and_comma_separated_values():
+    assert parse_tickers(['LVMUY,NKE', ' RL ', '', 'TPR,']) == ['LVMUY', 'NKE', 'RL', 'TPR']
+
+def test_stream_csv_writes_header_once_across_chunks():
+    chunks = fake_chunks(
+        ['stock_symbol', 'date', 'close_price'],
+        [('NKE', date(2024, 1, 2), Decimal('101.5'))],
+        [('NKE', date(2024, 1, 3), Decimal('102.25')), ('RL', date(2024, 1, 2), Decimal('140'))],
+    )
+    pieces = list(stream_csv(chunks))
+    assert len(pieces) == 2
+    rows = list(csv.reader(io.StringIO(''.join(pieces))))
+    assert rows == [
+        ['stock_symbol', 'date', 'close_price'],
+        ['NKE', '2024-01-02', '101.5'],
+        ['NKE', '2024-01-03', '102.25'],
+        ['RL', '2024-01-02', '140'],
+    ]
+
+def test_stream_csv_empty_export_has_header():
+    pieces = list(stream_csv(fake_chunks(['stock_symbol', 'date', 'close_price'])))
+    assert ''.join(pieces) == 'stock_symbol,date,close_price\r\n'
+
+def test_stream_parquet_mixed_decimal_scales_and_nulls():
+    pq = pytest.importorskip('pyarrow.parquet')
+    chunks = fake_chunks(
+        EVENT_IMPACT_COLUMNS,
+        # All-NULL prices in the first chunk, then decimals of different scales
+        [('NKE', date(2024, 2, 1), 'NYFW', None, None, None)],
+        [('NKE', date(2024, 9, 6), 'NYFW', Decimal('12.5'), Decimal('123.456789'), Decimal('110.956789'))],
+    )
+    column_types = EXPORT_QUERIES['event-impact']['column_types']
+    table = pq.read_table(io.BytesIO(b''.join(stream_parquet(chunks, column_types))))
+    assert table.column_names == EVENT_IMPACT_COLUMNS
+    assert str(table.schema.field('impact').type) == 'double'
+    assert table.column('post_event_price').to_pylist() == [None, 123.456789]
+    assert table.column('event_date').to_pylist() == [date(2024, 2, 1), date(2024, 9, 6)]
+
+def test_stream_parquet_one_row_group_per_chunk():
+    pq = pytest.importorskip('pyarrow.parquet')
+    chunks = fake_chunks(
+        ['stock_symbol', 'forecast_date', 'forecast_price'],
+        [('TPR', date(2024, 1, 2), Decimal('40.1'))],
+        [('TPR', date(2024, 1, 3), Decimal('40.2'))],
+        [('TPR', date(2024, 1, 4), Decimal('40.3'))],
+    )
+    data = b''.join(stream_parquet(chunks, EXPORT_QUERIES['forecast']['column_types']))
+    parquet_file = pq.ParquetFile(io.BytesIO(data))
+    assert parquet_file.num_row_groups == 3
+    assert parquet_file.read().column('forecast_price').to_pylist() == [40.1, 40.2, 40.3]
+
+def test_stream_parquet_empty_export_keeps_dataset_schema():
+    pq = pytest.importorskip('pyarrow.parquet')
+    column_types = EXPORT_QUERIES['stock-data']['column_types']
+    data = b''.join(stream_parquet(fake_chunks(['stock_symbol', 'date', 'close_price']), column_types))
+    table = pq.read_table(io.BytesIO(data))
+    assert table.num_rows == 0
+    assert [str(field.type) for field in table.schema] == ['string', 'date32[day]', 'double']
+
+def test_stream_export_raises_database_errors_before_streaming(monkeypatch):
+    def failing_chunks(*args):
+        raise ConnectionError("database is down")
+        yield
+
+    monkeypatch.setattr(export_data, 'iter_export_chunks', failing_chunks)
+    # The error must come from the call itself, before a caller could start sending a response
+    with pytest.raises(ConnectionError):
+        stream_export('postgresql://unused', 'stock-data', 'csv')
+
+def test_stream_export_streams_header_and_rows(monkeypatch):
+    monkeypatch.setattr(export_data, 'iter_export_chunks', lambda *args: fake_chunks(
+        ['stock_symbol', 'date', 'close_price'],
+        [('NKE', date(2024, 1, 2), Decimal('101.5'))],
+    ))
+    assert ''.join(stream_export('postgresql://unused', 'stock-data', 'csv')) == \
+        'stock_symbol,date,close_price\r\nNKE,2024-01-02,101.5\r\n'
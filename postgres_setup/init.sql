@@ -8,6 +8,9 @@ DROP TABLE IF EXISTS event_names CASCADE;
 DROP TABLE IF EXISTS stock_companies CASCADE;
 DROP TABLE IF EXISTS fashion_brands CASCADE;
 
+-- Trigram matching for event name search
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
 -- Create a table for storing stock companies with a unique ID
 CREATE TABLE stock_companies (
     id SERIAL PRIMARY KEY,
@@ -43,11 +46,18 @@ CREATE TABLE event_impact (
 );
 
 -- Create the event_names table
+-- normalized_description is the description with case, accents and punctuation removed, so near-duplicate names share one row
 CREATE TABLE event_names (
     id SERIAL PRIMARY KEY,
-    description TEXT UNIQUE NOT NULL
+    description TEXT UNIQUE NOT NULL,
+    normalized_description TEXT NOT NULL
 );
 
+-- Indexes for event name search and pagination
+CREATE UNIQUE INDEX event_names_normalized_idx ON event_names (normalized_description);
+CREATE INDEX event_names_normalized_trgm_idx ON event_names USING gin (normalized_description gin_trgm_ops);
+CREATE INDEX event_names_description_id_idx ON event_names (description, id);
+
 -- Create the event_dates table
 CREATE TABLE event_dates (
     id SERIAL PRIMARY KEY,
@@ -55,6 +65,10 @@ CREATE TABLE event_dates (
     event_date DATE NOT NULL
 );
 
+-- Each event is stored once per date
+CREATE UNIQUE INDEX event_dates_event_id_date_idx ON event_dates (event_id, event_date);
+CREATE INDEX event_dates_event_date_id_idx ON event_dates (event_date, id);
+
 -- Create the repeating_events table
 CREATE TABLE repeating_events (
     id SERIAL PRIMARY KEY,
@@ -65,6 +79,9 @@ CREATE TABLE repeating_events (
     stock_price NUMERIC NOT NULL
 );
 
+-- Each stock price is recorded once per event date
+CREATE UNIQUE INDEX repeating_events_date_stock_idx ON repeating_events (event_date_id, stock_id);
+
 -- Create a table for storing fashion brands and their associated stock symbol
 CREATE TABLE fashion_brands (
     id SERIAL PRIMARY KEY,